@@ -0,0 +1,31 @@
+"""
+Cached loading of config.toml shared by the translation and Excel QC scripts.
+"""
+
+import copy
+import os
+import sys
+from functools import lru_cache
+from typing import Any, Dict
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+
+def load_config(config_path: str = "config.toml") -> Dict[str, Any]:
+    """Return the parsed config, re-reading the file only when it has changed on disk.
+
+    Each caller gets its own deep copy, so a pipeline adjusting its settings at
+    runtime never leaks into other instances.
+    """
+    stat = os.stat(config_path)
+    return copy.deepcopy(_parse_config(os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=8)
+def _parse_config(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    # mtime_ns and size are only part of the cache key
+    with open(config_path, 'rb') as f:
+        return tomllib.load(f)
@@ -1,25 +1,34 @@
-import json
 import os
-import sys
 from pathlib import Path
+from typing import List, Union
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils import get_column_letter
 
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib
+from config_loader import load_config
+from json_io import find_json_files, load_json
 
 
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=12)
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+WRAP_ALIGNMENT = Alignment(wrap_text=True, vertical="top")
+COLUMN_WIDTHS = {'A': 40, 'B': 12, 'C': 25, 'D': 25, 'E': 50, 'F': 50, 'G': 50}
+WRAP_COLUMNS = ('E', 'F', 'G')
+
 class ExcelExporter:
     def __init__(self, config_path: str = "config.toml"):
-        with open(config_path, 'rb') as f:
-            self.config = tomllib.load(f)
+        self.config = load_config(config_path)
 
         self.trans_config = self.config['translation_settings']
         self.excel_config = self.config['excel_export']
 
+        # openpyxl silently falls back to the much slower xml.etree writer without lxml
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            raise RuntimeError("lxml is required for Excel export (run: pip install lxml)")
+
     def json_to_excel(self, input_folder: str, output_file: str):
         input_path = Path(input_folder)
 
@@ -27,7 +36,7 @@ class ExcelExporter:
             print(f"Error: Input folder '{input_folder}' does not exist")
             return
 
-        json_files = list(input_path.rglob('*.json'))
+        json_files = find_json_files(input_path)
 
         if not json_files:
             print(f"No JSON files found in '{input_folder}'")
@@ -35,8 +44,7 @@ class ExcelExporter:
 
         print(f"Found {len(json_files)} JSON files to export")
 
-        wb = Workbook()
-        wb.remove(wb.active)
+        wb = Workbook(write_only=True)
 
         for json_file in json_files:
             print(f"Processing: {json_file}")
@@ -45,67 +53,74 @@ class ExcelExporter:
         wb.save(output_file)
         print(f"\n✓ Excel file saved to: {output_file}")
 
-    def add_json_to_workbook(self, wb: Workbook, json_path: Path, base_path: Path):
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    def add_json_to_workbook(self, wb: Workbook, json_path: Union[str, Path], base_path: Union[str, Path]):
+        data = load_json(json_path)
 
-        relative_path = json_path.relative_to(base_path)
-        full_path_str = str(relative_path.with_suffix(''))
+        full_path_str = os.path.splitext(os.path.relpath(json_path, base_path))[0]
         sheet_name = full_path_str.replace(os.sep, '_')[:31]
 
         ws = wb.create_sheet(title=sheet_name)
 
-        headers = ['FilePath'] + self.excel_config['columns']
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = Font(bold=True, size=12)
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        row_idx = 2
-        for block in data.get('text', []):
-            ws.cell(row=row_idx, column=1, value=full_path_str)
-            ws.cell(row=row_idx, column=2, value=block.get('blockIdx', ''))
-            ws.cell(row=row_idx, column=3, value=block.get('jpName', ''))
-            ws.cell(row=row_idx, column=4, value=block.get('enName', ''))
-            ws.cell(row=row_idx, column=5, value=block.get('jpText', ''))
-            ws.cell(row=row_idx, column=6, value=block.get('enText', ''))
-            ws.cell(row=row_idx, column=7, value='')
+        # write_only sheets need layout settings before the first row is appended
+        for column, width in COLUMN_WIDTHS.items():
+            ws.column_dimensions[column].width = width
+        ws.freeze_panes = 'A2'
 
-            ws.cell(row=row_idx, column=5).alignment = Alignment(wrap_text=True, vertical="top")
-            ws.cell(row=row_idx, column=6).alignment = Alignment(wrap_text=True, vertical="top")
-            ws.cell(row=row_idx, column=7).alignment = Alignment(wrap_text=True, vertical="top")
+        # Column styles only reach cells created later in Excel (e.g. QC entries typed by
+        # reviewers); the written data cells still carry their own wrap style below
+        for column in WRAP_COLUMNS:
+            ws.column_dimensions[column].alignment = WRAP_ALIGNMENT
 
-            row_idx += 1
+        headers = ['FilePath'] + self.excel_config['columns']
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = HEADER_FONT
+            cell.fill = HEADER_FILL
+            cell.alignment = HEADER_ALIGNMENT
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        row_count = 0
+        for block in data.get('text', []):
+            ws.append(self._build_row(
+                ws,
+                full_path_str,
+                block.get('blockIdx', ''),
+                block.get('jpName', ''),
+                block.get('enName', ''),
+                block.get('jpText', ''),
+                block.get('enText', '')
+            ))
+            row_count += 1
 
             if 'choices' in block and block['choices']:
                 for choice_idx, choice in enumerate(block['choices']):
-                    ws.cell(row=row_idx, column=1, value=full_path_str)
-                    ws.cell(row=row_idx, column=2, value=f"{block.get('blockIdx', '')}-C{choice_idx + 1}")
-                    ws.cell(row=row_idx, column=3, value="[Choice]")
-                    ws.cell(row=row_idx, column=4, value="[Choice]")
-                    ws.cell(row=row_idx, column=5, value=choice.get('jpText', ''))
-                    ws.cell(row=row_idx, column=6, value=choice.get('enText', ''))
-                    ws.cell(row=row_idx, column=7, value='')
-
-                    ws.cell(row=row_idx, column=5).alignment = Alignment(wrap_text=True, vertical="top")
-                    ws.cell(row=row_idx, column=6).alignment = Alignment(wrap_text=True, vertical="top")
-                    ws.cell(row=row_idx, column=7).alignment = Alignment(wrap_text=True, vertical="top")
-
-                    row_idx += 1
-
-        ws.column_dimensions['A'].width = 40
-        ws.column_dimensions['B'].width = 12
-        ws.column_dimensions['C'].width = 25
-        ws.column_dimensions['D'].width = 25
-        ws.column_dimensions['E'].width = 50
-        ws.column_dimensions['F'].width = 50
-        ws.column_dimensions['G'].width = 50
-
-        ws.freeze_panes = 'A2'
-
-        print(f"  Added {row_idx - 2} rows to sheet '{sheet_name}'")
+                    ws.append(self._build_row(
+                        ws,
+                        full_path_str,
+                        f"{block.get('blockIdx', '')}-C{choice_idx + 1}",
+                        "[Choice]",
+                        "[Choice]",
+                        choice.get('jpText', ''),
+                        choice.get('enText', '')
+                    ))
+                    row_count += 1
+
+        # Finalize the sheet now so its temp file and XML writer are released, instead of
+        # keeping one open per sheet until wb.save()
+        ws.close()
+
+        print(f"  Added {row_count} rows to sheet '{sheet_name}'")
+
+    def _build_row(self, ws, file_path: str, block_idx, jp_name: str,
+                   en_name: str, jp_text: str, en_text: str) -> List:
+        row = [file_path, block_idx, jp_name, en_name]
+        for value in (jp_text, en_text, ''):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.alignment = WRAP_ALIGNMENT
+            row.append(cell)
+        return row
 
     def export_translated_files(self):
         output_folder = self.trans_config['output_folder']
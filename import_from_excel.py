@@ -1,20 +1,23 @@
-import json
 import os
-import sys
 from pathlib import Path
 from openpyxl import load_workbook
 from typing import Dict, List
 
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib
+from config_loader import load_config
+from json_io import dump_json, find_json_files, load_json
+
+# Data positions (0-based) in every row ExcelExporter writes:
+# FilePath, blockIdx, jpName, enName, jpText, enText, QC
+COL_BLOCKIDX = 1
+COL_ENNAME = 3
+COL_ENTEXT = 5
+COL_QC = 6
+EXPORTED_HEADERS = ('FilePath', 'blockIdx', 'jpName', 'enName', 'jpText', 'enText', 'QC')
 
 
 class ExcelImporter:
     def __init__(self, config_path: str = "config.toml"):
-        with open(config_path, 'rb') as f:
-            self.config = tomllib.load(f)
+        self.config = load_config(config_path)
 
         self.trans_config = self.config['translation_settings']
         self.excel_config = self.config['excel_export']
@@ -25,75 +28,83 @@ class ExcelImporter:
             return
 
         print(f"Loading Excel file: {excel_file}")
-        wb = load_workbook(excel_file, data_only=True)
-
-        output_path = Path(output_folder)
-        all_json_files = list(output_path.rglob('*.json'))
-
-        for sheet_name in wb.sheetnames:
-            print(f"\nProcessing sheet: {sheet_name}")
-            ws = wb[sheet_name]
+        wb = load_workbook(excel_file, read_only=True, data_only=True)
+
+        try:
+            output_path = Path(output_folder)
+            # Sheet names are the relative path with separators flattened to '_' and cut to
+            # Excel's 31-char limit; index them once so unmatched sheets are a dict lookup
+            truncated_map = {}
+            for json_file in find_json_files(output_path):
+                relative_name = os.path.splitext(os.path.relpath(json_file, output_path))[0]
+                truncated_map.setdefault(relative_name.replace(os.sep, '_')[:31], Path(json_file))
+
+            for sheet_name in wb.sheetnames:
+                print(f"\nProcessing sheet: {sheet_name}")
+                ws = wb[sheet_name]
+
+                first_row = next(ws.iter_rows(min_row=2, max_row=2, max_col=1, values_only=True), (None,))
+                file_path_cell = first_row[0]
+
+                if file_path_cell:
+                    json_path = output_path / (file_path_cell + '.json')
+                    print(f"  Using FilePath from column A: {file_path_cell}")
+                else:
+                    json_path = output_path / (sheet_name.replace('_', os.sep) + '.json')
 
-            file_path_cell = ws.cell(row=2, column=1).value
+                    if not json_path.exists():
+                        matching_file = truncated_map.get(sheet_name)
 
-            if file_path_cell:
-                json_filename = file_path_cell + '.json'
-                json_path = Path(output_folder) / json_filename
-                print(f"  Using FilePath from column A: {file_path_cell}")
-            else:
-                json_filename = sheet_name.replace('_', os.sep) + '.json'
-                json_path = Path(output_folder) / json_filename
+                        if matching_file:
+                            json_path = matching_file
+                            print(f"  Matched truncated sheet name to: {json_path.name}")
+                        else:
+                            print(f"  Warning: No matching JSON found for sheet '{sheet_name}', skipping...")
+                            continue
 
                 if not json_path.exists():
-                    matching_file = None
-                    for json_file in all_json_files:
-                        relative_path = json_file.relative_to(output_path)
-                        truncated_name = str(relative_path.with_suffix('')).replace(os.sep, '_')[:31]
-
-                        if truncated_name == sheet_name:
-                            matching_file = json_file
-                            break
-
-                    if matching_file:
-                        json_path = matching_file
-                        print(f"  Matched truncated sheet name to: {json_path.name}")
-                    else:
-                        print(f"  Warning: No matching JSON found for sheet '{sheet_name}', skipping...")
-                        continue
-
-            if not json_path.exists():
-                print(f"  Warning: Original JSON not found at {json_path}, skipping...")
-                continue
-
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                    print(f"  Warning: Original JSON not found at {json_path}, skipping...")
+                    continue
 
-            updates = self.read_sheet_data(ws)
-            updated_count = self.apply_updates(data, updates)
+                data = load_json(json_path)
 
-            output_path = Path(output_folder) / json_filename
-            os.makedirs(output_path.parent, exist_ok=True)
+                updates = self.read_sheet_data(ws)
+                updated_count = self.apply_updates(data, updates)
 
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
+                # Write back to the file that was read; a truncated-name match can live somewhere
+                # other than the path derived from the sheet name
+                dump_json(data, json_path, pretty=self.trans_config.get('pretty_output', True))
 
-            print(f"  Updated {updated_count} entries")
-            print(f"  Saved to: {output_path}")
+                print(f"  Updated {updated_count} entries")
+                print(f"  Saved to: {json_path}")
+        finally:
+            wb.close()
 
         print("\n✓ Import complete!")
 
     def read_sheet_data(self, ws) -> Dict:
         updates = {'blocks': {}, 'choices': {}}
 
-        headers = self.excel_config['columns']
-        col_map = {}
-        for col_idx in range(1, ws.max_column + 1):
-            header = ws.cell(row=1, column=col_idx).value
-            if header in headers:
-                col_map[header] = col_idx
+        rows = ws.iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            return updates
+
+        # Always read the fixed positions the exporter writes; the header labels come from
+        # config and can be renamed or reordered, so they're only checked, never trusted
+        headers = tuple(header_row[:len(EXPORTED_HEADERS)])
+        if headers != EXPORTED_HEADERS:
+            print(f"  Warning: Header row {list(headers)} does not match {list(EXPORTED_HEADERS)}, "
+                  f"reading columns by position")
+
+        row_width = COL_QC + 1
 
-        for row_idx in range(2, ws.max_row + 1):
-            block_idx_cell = ws.cell(row=row_idx, column=col_map.get('blockIdx', 1)).value
+        for row in rows:
+            # read-only sheets can yield short rows when trailing cells are empty
+            if len(row) < row_width:
+                row = row + (None,) * (row_width - len(row))
+
+            block_idx_cell = row[COL_BLOCKIDX]
 
             if not block_idx_cell:
                 continue
@@ -101,18 +112,23 @@ class ExcelImporter:
             block_idx_str = str(block_idx_cell)
 
             if '-C' in block_idx_str:
-                choice_key = block_idx_str
+                # "12-C3" -> (12, 2): block index plus zero-based choice position
+                block_part, choice_part = block_idx_str.rsplit('-C', 1)
+                try:
+                    choice_key = (int(block_part), int(choice_part) - 1)
+                except ValueError:
+                    continue
                 updates['choices'][choice_key] = {
-                    'enText': ws.cell(row=row_idx, column=col_map.get('enText', 5)).value or '',
-                    'QC': ws.cell(row=row_idx, column=col_map.get('QC', 6)).value or ''
+                    'enText': row[COL_ENTEXT] or '',
+                    'QC': row[COL_QC] or ''
                 }
             else:
                 try:
                     block_idx = int(block_idx_str)
                     updates['blocks'][block_idx] = {
-                        'enName': ws.cell(row=row_idx, column=col_map.get('enName', 3)).value or '',
-                        'enText': ws.cell(row=row_idx, column=col_map.get('enText', 5)).value or '',
-                        'QC': ws.cell(row=row_idx, column=col_map.get('QC', 6)).value or ''
+                        'enName': row[COL_ENNAME] or '',
+                        'enText': row[COL_ENTEXT] or '',
+                        'QC': row[COL_QC] or ''
                     }
                 except ValueError:
                     continue
@@ -120,50 +136,50 @@ class ExcelImporter:
         return updates
 
     def apply_updates(self, data: Dict, updates: Dict) -> int:
+        blocks = data.get('text', [])
+        block_map = {block.get('blockIdx'): block for block in blocks}
+        choice_map = {
+            (block.get('blockIdx'), choice_idx): choice
+            for block in blocks
+            for choice_idx, choice in enumerate(block.get('choices') or [])
+        }
+
         updated_count = 0
 
-        for block in data.get('text', []):
-            block_idx = block.get('blockIdx')
+        for block_idx, update_data in updates['blocks'].items():
+            block = block_map.get(block_idx)
+            if block is None:
+                continue
 
-            if block_idx in updates['blocks']:
-                update_data = updates['blocks'][block_idx]
+            updated_count += self._apply_text_update(block, update_data)
 
-                qc_value = update_data.get('QC', '').strip()
-                if qc_value:
-                    if block.get('enText', '') != qc_value:
-                        block['enText'] = qc_value
-                        updated_count += 1
-                else:
-                    en_text = update_data.get('enText', '').strip()
-                    if en_text and block.get('enText', '') != en_text:
-                        block['enText'] = en_text
-                        updated_count += 1
-
-                en_name = update_data.get('enName', '').strip()
-                if en_name and block.get('enName', '') != en_name:
-                    block['enName'] = en_name
-                    updated_count += 1
-
-            if 'choices' in block and block['choices']:
-                for choice_idx, choice in enumerate(block['choices']):
-                    choice_key = f"{block_idx}-C{choice_idx + 1}"
-
-                    if choice_key in updates['choices']:
-                        choice_data = updates['choices'][choice_key]
-
-                        qc_value = choice_data.get('QC', '').strip()
-                        if qc_value:
-                            if choice.get('enText', '') != qc_value:
-                                choice['enText'] = qc_value
-                                updated_count += 1
-                        else:
-                            en_text = choice_data.get('enText', '').strip()
-                            if en_text and choice.get('enText', '') != en_text:
-                                choice['enText'] = en_text
-                                updated_count += 1
+            en_name = update_data.get('enName', '').strip()
+            if en_name and block.get('enName', '') != en_name:
+                block['enName'] = en_name
+                updated_count += 1
+
+        for choice_key, choice_data in updates['choices'].items():
+            choice = choice_map.get(choice_key)
+            if choice is not None:
+                updated_count += self._apply_text_update(choice, choice_data)
 
         return updated_count
 
+    def _apply_text_update(self, target: Dict, update_data: Dict) -> int:
+        # A QC correction wins over an edited enText cell
+        qc_value = update_data.get('QC', '').strip()
+        if qc_value:
+            if target.get('enText', '') != qc_value:
+                target['enText'] = qc_value
+                return 1
+            return 0
+
+        en_text = update_data.get('enText', '').strip()
+        if en_text and target.get('enText', '') != en_text:
+            target['enText'] = en_text
+            return 1
+        return 0
+
     def import_qc_updates(self, excel_file: str = None):
         if excel_file is None:
             excel_file = self.excel_config['output_file']
@@ -0,0 +1,117 @@
+"""
+JSON file helpers shared by the translation and Excel QC scripts.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. For the strings, integers and containers that make up story files,
+output is byte-for-byte what json.dump(..., ensure_ascii=False, indent=4)
+produces. Where orjson differs, the values still survive a round trip:
+
+- Floats can be written in another notation (1e-05 as 0.00001, 1e+20 as 1e20).
+- NaN and Infinity are written as null.
+- Integers wider than 64 bits and documents containing NaN/Infinity are handed to
+  the standard library, which supports both.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, List, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def find_json_files(root: Union[str, Path]) -> List[str]:
+    """Return the sorted paths of all .json files under root, recursively.
+
+    Walks with os.scandir and returns plain strings, which is several times faster
+    than Path.rglob on large trees. Symlinked directories are not followed. Like
+    rglob, a missing root gives an empty list and unreadable directories are skipped.
+    """
+    if not os.path.isdir(root):
+        return []
+
+    found = []
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.json') and entry.is_file():
+                    found.append(entry.path)
+    found.sort()
+    return found
+
+
+def load_json(path: Union[str, Path]) -> Any:
+    """Read and parse a UTF-8 JSON file."""
+    return parse_json(Path(path).read_bytes())
+
+
+def parse_json(raw: Union[str, bytes]) -> Any:
+    """Parse a JSON document held in memory, e.g. an API reply."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which the standard library accepts; genuinely
+            # invalid JSON fails again below with the usual error
+            pass
+    return json.loads(raw)
+
+
+def encode_json(data: Any) -> bytes:
+    """Serialize data to compact UTF-8 JSON bytes, e.g. for a request body."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except orjson.JSONEncodeError:
+            # Integers wider than 64 bits
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dump_json(data: Any, path: Union[str, Path], pretty: bool = True) -> None:
+    """Write data to path as UTF-8 JSON, overwriting it.
+
+    pretty=True gives 4-space indentation; pretty=False writes compact JSON with no
+    whitespace, which is smaller and faster to write.
+    """
+    if orjson is not None:
+        try:
+            if pretty:
+                encoded = _reindent(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                encoded = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # Integers wider than 64 bits; nothing has been written yet
+            pass
+        else:
+            Path(path).write_bytes(encoded)
+            return
+
+    with open(path, 'w', encoding='utf-8') as f:
+        if pretty:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        else:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _reindent(encoded: bytes) -> bytes:
+    # orjson only supports 2-space indentation. JSON strings cannot contain raw
+    # newlines or tabs, so leading spaces on a line are always indentation: swap
+    # each level for a tab (deepest first, so shallower passes can't re-match),
+    # then expand the tabs to 4 spaces.
+    depth = 0
+    while b'\n' + b'  ' * (depth + 1) in encoded:
+        depth += 1
+    for level in range(depth, 0, -1):
+        encoded = encoded.replace(b'\n' + b'  ' * level, b'\n' + b'\t' * level)
+    return encoded.replace(b'\t', b'    ')
@@ -2,9 +2,9 @@
 
 import sys
 import argparse
-from translate import TranslationPipeline
-from export_to_excel import ExcelExporter
-from import_from_excel import ExcelImporter
+
+# The pipeline modules pull in requests/openpyxl, so they are imported only by the
+# commands that use them to keep --help and the menu fast.
 
 
 def print_banner():
@@ -18,6 +18,9 @@ def print_banner():
 
 
 def translate_workflow():
+    from translate import TranslationPipeline
+    from export_to_excel import ExcelExporter
+
     print("\n[1/2] Starting translation...")
     print("=" * 60)
 
@@ -38,6 +41,8 @@ def translate_workflow():
 
 
 def import_qc_workflow():
+    from import_from_excel import ExcelImporter
+
     print("\nImporting QC updates from Excel...")
     print("=" * 60)
 
@@ -61,11 +66,15 @@ def show_menu():
     choice = input("\nEnter your choice (1-5): ").strip()
 
     if choice == '1':
+        from translate import TranslationPipeline
+
         print("\nStarting translation...")
         pipeline = TranslationPipeline()
         pipeline.translate_folder()
 
     elif choice == '2':
+        from export_to_excel import ExcelExporter
+
         print("\nExporting to Excel...")
         exporter = ExcelExporter()
         exporter.export_translated_files()
@@ -120,11 +129,15 @@ Examples:
     args = parser.parse_args()
 
     if args.translate:
+        from translate import TranslationPipeline
+
         print_banner()
         pipeline = TranslationPipeline()
         pipeline.translate_folder()
 
     elif args.export:
+        from export_to_excel import ExcelExporter
+
         print_banner()
         exporter = ExcelExporter()
         exporter.export_translated_files()
@@ -6,7 +6,6 @@ Test script to verify MTL Translation Tools setup
 import json
 import os
 import sys
-import requests
 
 # Handle TOML imports for different Python versions
 if sys.version_info >= (3, 11):
@@ -79,6 +78,8 @@ def test_folders(config):
 
 def test_llm_connection(config):
     """Test connection to LLM API."""
+    import requests
+
     print("\nTesting LLM connection...")
 
     llm_config = config['llm_settings']
@@ -144,6 +145,18 @@ def test_dependencies():
     except ImportError:
         print("  ✗ openpyxl not installed (run: pip install openpyxl)")
 
+    try:
+        import lxml
+        print("  ✓ lxml installed")
+    except ImportError:
+        print("  ✗ lxml not installed (run: pip install lxml)")
+
+    try:
+        import orjson
+        print("  ✓ orjson installed")
+    except ImportError:
+        print("  ⚠ orjson not installed, falling back to slower json (run: pip install orjson)")
+
 
 def main():
     """Run all tests."""
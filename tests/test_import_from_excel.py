@@ -0,0 +1,131 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from export_to_excel import ExcelExporter
+from import_from_excel import ExcelImporter
+
+DATA_DIR = Path(__file__).parent / 'data'
+CONFIG_PATH = DATA_DIR / 'config.toml'
+
+# Relative story paths; the last one is too long for a sheet name and gets truncated
+STORY_FILES = ['story/a.json', 'event/b.json', 'story/main_scenario_chapter_01/episode_0042.json']
+
+# Sheet rows for story.json: header, block 1, block 2, choices 2-C1 and 2-C2, block 3
+ROW_BLOCK_1, ROW_BLOCK_2, ROW_CHOICE_1, ROW_CHOICE_2 = 2, 3, 4, 5
+COL_FILEPATH, COL_ENNAME, COL_QC = 1, 4, 7
+
+
+@pytest.fixture
+def slop(tmp_path):
+    root = tmp_path / 'slop'
+    for relative in STORY_FILES:
+        (root / relative).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(DATA_DIR / 'story.json', root / relative)
+    return root
+
+
+def export(slop, tmp_path):
+    excel_file = tmp_path / 'translations.xlsx'
+    ExcelExporter(str(CONFIG_PATH)).json_to_excel(str(slop), str(excel_file))
+    return excel_file
+
+
+def sheet_for(wb, relative):
+    sheet_name = str(Path(relative).with_suffix('')).replace('\\', '_').replace('/', '_')[:31]
+    return wb[sheet_name]
+
+
+def load(slop, relative):
+    return json.loads((slop / relative).read_text(encoding='utf-8'))
+
+
+def test_export_writes_one_sheet_per_file_with_choice_rows(slop, tmp_path):
+    wb = load_workbook(export(slop, tmp_path))
+    ws = sheet_for(wb, 'story/a.json')
+
+    assert len(wb.sheetnames) == len(STORY_FILES)
+    assert [cell.value for cell in ws[1]] == ['FilePath', 'blockIdx', 'jpName', 'enName', 'jpText', 'enText', 'QC']
+    assert [cell.value for cell in ws[ROW_CHOICE_2]][:6] == [
+        'story/a', '2-C2', '[Choice]', '[Choice]', 'どうぞどうぞ', 'Go ahead'
+    ]
+
+
+def test_round_trip_applies_qc_edits(slop, tmp_path):
+    excel_file = export(slop, tmp_path)
+    original = load(slop, 'story/a.json')
+
+    wb = load_workbook(excel_file)
+    ws = sheet_for(wb, 'story/a.json')
+    ws.cell(row=ROW_BLOCK_1, column=COL_QC).value = 'Taiyaki! Last one!'
+    ws.cell(row=ROW_BLOCK_2, column=COL_ENNAME).value = 'Tannhauser'
+    ws.cell(row=ROW_CHOICE_2, column=COL_QC).value = 'After you'
+    wb.save(excel_file)
+
+    ExcelImporter(str(CONFIG_PATH)).excel_to_json(str(excel_file), str(slop))
+
+    data = load(slop, 'story/a.json')
+    blocks = data['text']
+    assert blocks[0]['enText'] == 'Taiyaki! Last one!'
+    assert blocks[1]['enName'] == 'Tannhauser'
+    assert blocks[1]['choices'][0]['enText'] == 'Excuse me, one...'
+    assert blocks[1]['choices'][1]['enText'] == 'After you'
+
+    # Nothing else in the file is touched
+    blocks[0]['enText'] = original['text'][0]['enText']
+    blocks[1]['enName'] = original['text'][1]['enName']
+    blocks[1]['choices'][1]['enText'] = original['text'][1]['choices'][1]['enText']
+    assert data == original
+
+
+@pytest.mark.parametrize('relative', ['event/b.json', 'story/main_scenario_chapter_01/episode_0042.json'])
+def test_round_trip_with_blank_filepath_uses_sheet_name(slop, tmp_path, relative):
+    excel_file = export(slop, tmp_path)
+
+    wb = load_workbook(excel_file)
+    ws = sheet_for(wb, relative)
+    for row in range(2, ws.max_row + 1):
+        ws.cell(row=row, column=COL_FILEPATH).value = None
+    ws.cell(row=ROW_CHOICE_1, column=COL_QC).value = 'Pardon me, one...'
+    wb.save(excel_file)
+
+    ExcelImporter(str(CONFIG_PATH)).excel_to_json(str(excel_file), str(slop))
+
+    # The update lands in the file the sheet came from, and in no other
+    assert load(slop, relative)['text'][1]['choices'][0]['enText'] == 'Pardon me, one...'
+    for other in STORY_FILES:
+        if other != relative:
+            assert load(slop, other) == load(DATA_DIR, 'story.json')
+    assert sorted(p.relative_to(slop).as_posix() for p in slop.rglob('*.json')) == sorted(STORY_FILES)
+
+
+def test_import_into_missing_folder_skips_sheets(slop, tmp_path):
+    excel_file = export(slop, tmp_path)
+
+    ExcelImporter(str(CONFIG_PATH)).excel_to_json(str(excel_file), str(tmp_path / 'missing'))
+
+    assert not (tmp_path / 'missing').exists()
+
+
+def test_round_trip_with_reordered_config_columns(slop, tmp_path, capsys):
+    # The exporter always writes data in the same order, so the importer must read by
+    # position rather than trust header labels that follow the configured order
+    config_path = tmp_path / 'config.toml'
+    config_path.write_text(CONFIG_PATH.read_text(encoding='utf-8').replace(
+        'columns = ["blockIdx", "jpName", "enName", "jpText", "enText", "QC"]',
+        'columns = ["QC", "enText", "jpText", "enName", "jpName", "blockIdx"]'
+    ), encoding='utf-8')
+
+    excel_file = tmp_path / 'translations.xlsx'
+    ExcelExporter(str(config_path)).json_to_excel(str(slop), str(excel_file))
+    wb = load_workbook(excel_file)
+    sheet_for(wb, 'story/a.json').cell(row=ROW_BLOCK_1, column=COL_QC).value = 'Taiyaki! Last one!'
+    wb.save(excel_file)
+
+    ExcelImporter(str(config_path)).excel_to_json(str(excel_file), str(slop))
+
+    assert load(slop, 'story/a.json')['text'][0]['enText'] == 'Taiyaki! Last one!'
+    assert 'does not match' in capsys.readouterr().out
@@ -0,0 +1,146 @@
+import json
+import math
+import os
+
+import pytest
+
+import json_io
+
+CASES = {
+    'story': {
+        'version': 6,
+        'title': 'ゆるふわ、たったか、始動します',
+        'text': [
+            {
+                'jpName': 'たい焼き屋',
+                'jpText': 'たい焼き、たい焼き～？\r\n残りあと1個だよ！',
+                'enText': '',
+                'choices': [{'jpText': 'すみません、1つ――', 'enText': ''}],
+                'animData': [],
+            },
+            {'jpName': '', 'jpText': '', 'choices': [], 'nextBlock': -1, 'origClipLength': 0.5},
+        ],
+    },
+    'empty_containers': {'a': {}, 'b': [], 'c': [{}, [], [[]], {'d': {}}], 'e': ''},
+    'empty_top_level_dict': {},
+    'empty_top_level_list': [],
+    'whitespace_heavy': {
+        '  key with spaces  ': '  leading and trailing  ',
+        'newlines': '\n\nline\n  indented line\n\t tabbed\n',
+        'escapes': 'quote " backslash \\ slash / \u0000 \u001f',
+        'list': ['    ', '\r\n', ' \t ', '  [  {  '],
+    },
+    'deep_nesting': {'l1': {'l2': {'l3': {'l4': {'l5': {'l6': [1, [2, [3, [4]]]]}}}}}},
+    'scalars': {'t': True, 'f': False, 'n': None, 'i': -12, 'big': 2 ** 53, 'unicode': '🎠 ウマ娘'},
+    'plain_floats': {'clip': 0.5, 'tenth': 0.1, 'neg': -2.75, 'long': 123456789.123, 'zero': 0.0, 'list': [1.0, 3.5]},
+    'wide_integers': {'u64_max': 2 ** 64 - 1, 'beyond_64_bits': 2 ** 70, 'negative': -(2 ** 80)},
+}
+
+# orjson writes these in a different notation from json.dump, so only the values are compared
+EXPONENT_FLOATS = {'small': 1e-05, 'large': 1e+20, 'tiny': 2.5e-07, 'list': [1e16, 6.02e23]}
+
+
+def _stdlib_pretty(data):
+    return json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8')
+
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'stdlib'])
+def backend(request, monkeypatch):
+    if request.param:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(json_io, 'orjson', None)
+
+
+@pytest.mark.parametrize('data', CASES.values(), ids=CASES.keys())
+def test_dump_json_matches_stdlib_indent4(tmp_path, backend, data):
+    path = tmp_path / 'out.json'
+    json_io.dump_json(data, path)
+
+    assert path.read_bytes() == _stdlib_pretty(data)
+
+
+@pytest.mark.parametrize('data', CASES.values(), ids=CASES.keys())
+def test_dump_json_compact_round_trips(tmp_path, backend, data):
+    path = tmp_path / 'out.json'
+    json_io.dump_json(data, path, pretty=False)
+
+    raw = path.read_bytes()
+    assert raw == json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    assert json_io.load_json(path) == data
+
+
+@pytest.mark.parametrize('data', CASES.values(), ids=CASES.keys())
+def test_load_json_round_trips(tmp_path, backend, data):
+    path = tmp_path / 'in.json'
+    path.write_bytes(_stdlib_pretty(data))
+
+    assert json_io.load_json(path) == data
+
+
+@pytest.mark.parametrize('pretty', [True, False], ids=['pretty', 'compact'])
+def test_dump_json_exponent_floats_keep_their_values(tmp_path, backend, pretty):
+    path = tmp_path / 'out.json'
+    json_io.dump_json(EXPONENT_FLOATS, path, pretty=pretty)
+
+    assert json.loads(path.read_bytes()) == EXPONENT_FLOATS
+
+
+def test_load_json_accepts_nan_and_infinity(tmp_path, backend):
+    path = tmp_path / 'in.json'
+    path.write_text('{"a": NaN, "b": Infinity, "c": -Infinity}', encoding='utf-8')
+
+    data = json_io.load_json(path)
+
+    assert math.isnan(data['a'])
+    assert data['b'] == math.inf and data['c'] == -math.inf
+
+
+def test_load_json_still_rejects_invalid_json(tmp_path, backend):
+    path = tmp_path / 'in.json'
+    path.write_text('{"a": ', encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        json_io.load_json(path)
+
+
+def test_encode_json_handles_wide_integers(backend):
+    assert json.loads(json_io.encode_json({'n': 2 ** 70})) == {'n': 2 ** 70}
+
+
+def test_find_json_files_is_sorted_and_recursive(tmp_path):
+    (tmp_path / 'story' / 'sub').mkdir(parents=True)
+    (tmp_path / 'event').mkdir()
+    for name in ('story/sub/b.json', 'story/a.json', 'event/c.json', 'story/notes.txt'):
+        (tmp_path / name).write_text('{}', encoding='utf-8')
+
+    found = json_io.find_json_files(tmp_path)
+
+    assert found == sorted(found)
+    assert [p.replace(str(tmp_path), '').replace('\\', '/') for p in found] == [
+        '/event/c.json', '/story/a.json', '/story/sub/b.json'
+    ]
+
+
+def test_find_json_files_missing_root_is_empty(tmp_path):
+    assert json_io.find_json_files(tmp_path / 'missing') == []
+
+
+def test_find_json_files_skips_unreadable_directories(tmp_path, monkeypatch):
+    (tmp_path / 'locked').mkdir()
+    (tmp_path / 'open').mkdir()
+    (tmp_path / 'locked' / 'a.json').write_text('{}', encoding='utf-8')
+    (tmp_path / 'open' / 'b.json').write_text('{}', encoding='utf-8')
+
+    real_scandir = json_io.os.scandir
+
+    def scandir(path):
+        if os.path.basename(path) == 'locked':
+            raise PermissionError(13, 'Permission denied', path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(json_io.os, 'scandir', scandir)
+
+    found = json_io.find_json_files(tmp_path)
+
+    assert [os.path.relpath(p, tmp_path) for p in found] == [os.path.join('open', 'b.json')]
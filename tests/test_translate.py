@@ -0,0 +1,216 @@
+import json
+import threading
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import requests
+
+import translate
+from translate import TranslationPipeline
+from translation_cache import TranslationCache
+
+CONFIG_PATH = Path(__file__).parent / 'data' / 'config.toml'
+
+
+def make_response(status_code, content=None, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    if content is not None:
+        response._content = json.dumps({
+            'model': 'test-model',
+            'choices': [{'message': {'content': content}}]
+        }).encode('utf-8')
+    else:
+        response._content = b''
+    return response
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(translate.time, 'sleep', sleeps.append)
+    pipeline = TranslationPipeline(str(CONFIG_PATH))
+    pipeline.sleeps = sleeps
+    return pipeline
+
+
+def test_call_llm_returns_stripped_content(pipeline):
+    with mock.patch.object(pipeline.session, 'post', return_value=make_response(200, '  Hello  ')) as post:
+        assert pipeline.call_llm('こんにちは') == 'Hello'
+
+    assert post.call_count == 1
+    body = json.loads(post.call_args.kwargs['data'])
+    assert body['model'] == 'test-model'
+    assert body['messages'][1]['content'] == 'Translate this to English: こんにちは'
+
+
+@pytest.mark.parametrize('status_code', sorted(translate.RETRYABLE_STATUS_CODES))
+def test_call_llm_retries_transient_status_codes(pipeline, status_code):
+    responses = [make_response(status_code), make_response(200, 'ok')]
+    with mock.patch.object(pipeline.session, 'post', side_effect=responses) as post:
+        assert pipeline.call_llm('x') == 'ok'
+
+    assert post.call_count == 2
+    assert len(pipeline.sleeps) == 1
+
+
+@pytest.mark.parametrize('status_code', [400, 401, 403, 404, 422])
+def test_call_llm_does_not_retry_client_errors(pipeline, status_code):
+    with mock.patch.object(pipeline.session, 'post', return_value=make_response(status_code)) as post:
+        assert pipeline.call_llm('x') is None
+
+    assert post.call_count == 1
+    assert pipeline.sleeps == []
+
+
+@pytest.mark.parametrize('exception', [
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+])
+def test_call_llm_retries_connection_failures(pipeline, exception):
+    with mock.patch.object(pipeline.session, 'post', side_effect=exception('boom')) as post:
+        assert pipeline.call_llm('x') is None
+
+    # retry_attempts = 2 in the test config: one try plus two retries
+    assert post.call_count == 3
+    assert len(pipeline.sleeps) == 2
+
+
+@pytest.mark.parametrize('exception', [
+    requests.exceptions.InvalidURL,
+    requests.exceptions.TooManyRedirects,
+    requests.exceptions.MissingSchema,
+])
+def test_call_llm_does_not_retry_config_errors(pipeline, exception):
+    with mock.patch.object(pipeline.session, 'post', side_effect=exception('bad')) as post:
+        assert pipeline.call_llm('x') is None
+
+    assert post.call_count == 1
+    assert pipeline.sleeps == []
+
+
+def test_call_llm_honours_retry_after(pipeline):
+    responses = [make_response(429, headers={'Retry-After': '7'}), make_response(200, 'ok')]
+    with mock.patch.object(pipeline.session, 'post', side_effect=responses):
+        assert pipeline.call_llm('x') == 'ok'
+
+    assert pipeline.sleeps == [7.0]
+
+
+def test_call_llm_backoff_stays_within_cap(pipeline):
+    with mock.patch.object(pipeline.session, 'post', side_effect=requests.exceptions.Timeout('slow')):
+        pipeline.call_llm('x')
+
+    base_delay = pipeline.trans_config['retry_delay']
+    for attempt, delay in enumerate(pipeline.sleeps):
+        assert 0 <= delay <= min(translate.MAX_RETRY_DELAY, base_delay * 2 ** attempt)
+
+
+def test_structured_batch_retries_unparseable_reply(pipeline):
+    pipeline.trans_config['structured_batch_output'] = True
+    truncated = '{"translations": [{"id": 1, "en": "Tai'
+    valid = json.dumps({'translations': [{'id': 1, 'en': 'Taiyaki'}, {'id': 2, 'en': 'One, please'}]})
+    responses = [make_response(200, truncated), make_response(200, valid)]
+
+    with mock.patch.object(pipeline.session, 'post', side_effect=responses) as post:
+        assert pipeline.translate_batch(['たい焼き', '1つください'], use_context=False) == ['Taiyaki', 'One, please']
+
+    assert post.call_count == 2
+
+
+def test_structured_batch_gives_up_after_retry_attempts(pipeline):
+    pipeline.trans_config['structured_batch_output'] = True
+    with mock.patch.object(pipeline.session, 'post', return_value=make_response(200, 'not json')) as post:
+        assert pipeline.translate_batch(['たい焼き'], use_context=False) == ['たい焼き']
+
+    # retry_attempts = 2 in the test config
+    assert post.call_count == 3
+
+
+def test_batch_response_format_is_valid_for_strict_mode():
+    # Strict structured output requires every object to forbid extra keys and require all of its properties
+    def objects(schema):
+        if schema.get('type') == 'object':
+            yield schema
+        children = list(schema.get('properties', {}).values())
+        if 'items' in schema:
+            children.append(schema['items'])
+        for child in children:
+            yield from objects(child)
+
+    json_schema = translate.BATCH_RESPONSE_FORMAT['json_schema']
+    assert json_schema['strict'] is True
+    for obj in objects(json_schema['schema']):
+        assert obj['additionalProperties'] is False
+        assert set(obj['required']) == set(obj['properties'])
+
+
+@pytest.fixture
+def cached_pipeline(pipeline, tmp_path):
+    pipeline.cache = TranslationCache(str(tmp_path / 'cache.jsonl'))
+    return pipeline
+
+
+def test_batch_with_wrong_line_count_is_not_cached(cached_pipeline):
+    # The model split the first translation over two lines, shifting the second one
+    reply = '1. One left!\nBuy one\n2. Excuse me, one'
+    with mock.patch.object(cached_pipeline.session, 'post', return_value=make_response(200, reply)):
+        assert cached_pipeline.translate_batch(['残りあと1個！', 'すみません、1つ'], use_context=False) == [
+            'One left!', 'Buy one'
+        ]
+
+    assert len(cached_pipeline.cache) == 0
+
+
+def test_aligned_batch_is_cached_and_reused(cached_pipeline):
+    reply = '1. One left!\n2. Excuse me, one'
+    with mock.patch.object(cached_pipeline.session, 'post', return_value=make_response(200, reply)) as post:
+        first = cached_pipeline.translate_batch(['残りあと1個！', 'すみません、1つ'], use_context=False)
+        second = cached_pipeline.translate_batch(['残りあと1個！', 'すみません、1つ'], use_context=False)
+
+    assert first == second == ['One left!', 'Excuse me, one']
+    assert len(cached_pipeline.cache) == 2
+    assert post.call_count == 1
+
+
+def test_second_pass_sends_each_failed_text_once(pipeline):
+    pipeline.trans_config['second_pass_model'] = 'second-model'
+    blocks = [{'jpName': 'トレーナー', 'enName': 'トレーナー'} for _ in range(3)]
+    choice = {'jpText': 'どうぞ', 'enText': 'どうぞ'}
+    failed_items = [(('name', block, 'トレーナー', idx), 'トレーナー') for idx, block in enumerate(blocks)]
+    failed_items.append((('choice', choice, 'どうぞ', 3), 'どうぞ'))
+
+    with mock.patch.object(pipeline.session, 'post', return_value=make_response(200, '1. Trainer\n2. Go ahead')) as post:
+        assert pipeline._second_pass_translation(failed_items) == 4
+
+    assert post.call_count == 1
+    body = json.loads(post.call_args.kwargs['data'])
+    assert body['model'] == 'second-model'
+    assert '1. トレーナー\n2. どうぞ\n' in body['messages'][1]['content']
+    assert [block['enName'] for block in blocks] == ['Trainer'] * 3
+    assert choice['enText'] == 'Go ahead'
+
+
+def test_second_pass_model_only_applies_to_its_own_thread(pipeline):
+    pipeline.trans_config['second_pass_model'] = 'second-model'
+    block = {'jpName': 'トレーナー', 'enName': 'トレーナー'}
+    models = []
+
+    def post(url, data, **kwargs):
+        models.append(json.loads(data)['model'])
+        if len(models) == 1:
+            # Another file translating concurrently while the second pass is running
+            other = threading.Thread(target=pipeline.call_llm, args=('こんにちは',))
+            other.start()
+            other.join()
+        return make_response(200, '1. Trainer')
+
+    with mock.patch.object(pipeline.session, 'post', side_effect=post):
+        pipeline._second_pass_translation([(('name', block, 'トレーナー', 0), 'トレーナー')])
+        pipeline.call_llm('こんにちは')
+
+    # The override is gone once the second pass finishes
+    assert models == ['second-model', 'test-model', 'test-model']
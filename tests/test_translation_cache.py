@@ -0,0 +1,40 @@
+import json
+
+from translation_cache import TranslationCache
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.jsonl')
+    cache = TranslationCache(path)
+    key = TranslationCache.make_key('model', 'prompt', '', 'たい焼き')
+    cache.put_many([(key, 'Taiyaki')])
+
+    reloaded = TranslationCache(path)
+
+    assert reloaded.get(key) == 'Taiyaki'
+    assert len(reloaded) == 1
+
+
+def test_unchanged_entries_are_not_appended_again(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    cache = TranslationCache(str(path))
+    cache.put_many([('k', 'v')])
+    cache.put_many([('k', 'v')])
+
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 1
+
+
+def test_truncated_lines_are_skipped(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    good = json.dumps({'key': 'k', 'text': 'v'}) + '\n'
+    path.write_text(good + '{"key": "broken", "te', encoding='utf-8')
+
+    cache = TranslationCache(str(path))
+
+    assert cache.get('k') == 'v'
+    assert cache.get('broken') is None
+
+
+def test_make_key_separates_parts():
+    assert TranslationCache.make_key('ab', 'c') != TranslationCache.make_key('a', 'bc')
+    assert TranslationCache.make_key('m1', 'text') != TranslationCache.make_key('m2', 'text')
@@ -1,22 +1,81 @@
-import json
 import os
-import sys
+import random
+import re
+import threading
 import time
 import requests
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from typing import Deque, Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib
+from config_loader import load_config
+from json_io import dump_json, encode_json, find_json_files, load_json, parse_json
+from translation_cache import TranslationCache, get_translation_cache
+
+# Transient server conditions worth retrying; other HTTP errors fail immediately
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Dropped or stalled connections, including a body cut off mid-transfer
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError
+)
+MAX_RETRY_DELAY = 60
+
+# Hiragana, katakana and CJK unified ideographs
+JAPANESE_RE = re.compile('[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]')
+# One line of a numbered batch reply, e.g. "3. text", "3) text" or "3: text"
+BATCH_LINE_RE = re.compile(r'^\d+[\.\)\:]\s*(.+)$')
+
+# Placeholder speaker the model emits for narration; removed after translation
+MONOLOGUE = 'monologue'
+
+# Wraps the previous dialogue lines sent as context
+CONTEXT_HEADER = "\n\nPrevious dialogue for context:\n"
+CONTEXT_FOOTER = "\n\nNow translate:"
+
+# Constrains structured batch replies to {"translations": [{"id": 1, "en": "..."}, ...]}
+BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "batch_translations",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "translations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "integer"},
+                            "en": {"type": "string"}
+                        },
+                        "required": ["id", "en"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["translations"],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+@lru_cache(maxsize=4096)
+def _contains_japanese(text: str) -> bool:
+    # The same translation is checked again by batch retries, per-item verification and
+    # the second pass, so remember recent results instead of rescanning
+    return JAPANESE_RE.search(text) is not None
 
 
 class TranslationPipeline:
     def __init__(self, config_path: str = "config.toml"):
-        with open(config_path, 'rb') as f:
-            self.config = tomllib.load(f)
+        self.config = load_config(config_path)
 
         self.llm_config = self.config['llm_settings']
         self.trans_config = self.config['translation_settings']
@@ -25,31 +84,78 @@ class TranslationPipeline:
         if self.trans_config['use_dictionary']:
             dict_file = self.trans_config['dictionary_file']
             if os.path.exists(dict_file):
-                with open(dict_file, 'r', encoding='utf-8') as f:
-                    self.dictionary = json.load(f)
+                self.dictionary = load_json(dict_file)
                 print(f"Loaded {len(self.dictionary)} dictionary entries")
 
+        # All terms in one alternation so each text is scanned once instead of once per
+        # entry; longest first, so a term wins over any shorter term it contains
+        self._dictionary_re = None
+        terms = sorted((term for term in self.dictionary if term), key=len, reverse=True)
+        if terms:
+            self._dictionary_re = re.compile('|'.join(map(re.escape, terms)))
+
+        self.cache: Optional[TranslationCache] = None
+        if self.trans_config.get('use_translation_cache', False):
+            self.cache = get_translation_cache(self.trans_config.get('translation_cache_file', 'translation_cache.jsonl'))
+
         self.context_lines = self.trans_config.get('context_lines', 0)
-        self.current_context: List[Dict[str, str]] = []
+        # Per-thread state, so one pipeline can translate several files at once: the
+        # dialogue context of the file being processed and any second-pass model override
+        self._local = threading.local()
+
+        # One keep-alive connection pool for every request this pipeline makes; retries
+        # are handled in call_llm, so the adapter must not retry on its own
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.llm_config['api_key']}",
+            "Connection": "keep-alive"
+        })
+        pool_size = (max(1, self.trans_config.get('concurrent_files', 1)) *
+                     max(1, self.trans_config.get('inflight_batches', 4)))
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Request fields that never change between calls. Model and temperature are read per
+        # call because the second pass overrides them
+        self._system_message = {"role": "system", "content": self.llm_config['system_prompt']}
+        self._payload_template = {
+            "max_tokens": self.llm_config['max_tokens'],
+            "min_p": self.llm_config.get('min_p', 0.05)
+        }
+        for param in ('top_p', 'top_k'):
+            if self.llm_config.get(param) is not None:
+                self._payload_template[param] = self.llm_config[param]
+
+        # One-time debug prints already shown, guarded for batches sent from worker threads
+        self._logged = set()
+        self._debug_lock = threading.Lock()
+
+    @property
+    def current_context(self) -> Deque[Dict[str, str]]:
+        # Oldest entries drop off automatically once context_lines are held
+        context = getattr(self._local, 'context', None)
+        if context is None:
+            context = self._local.context = deque(maxlen=max(self.context_lines, 1))
+        return context
+
+    def _llm_setting(self, key: str):
+        overrides = getattr(self._local, 'llm_overrides', None)
+        if overrides and key in overrides:
+            return overrides[key]
+        return self.llm_config[key]
 
     def preprocess_text(self, text: str) -> str:
-        preprocessed = text
-        for jp_term, en_term in self.dictionary.items():
-            preprocessed = preprocessed.replace(jp_term, en_term)
-        return preprocessed
+        if self._dictionary_re is None:
+            return text
+        return self._dictionary_re.sub(lambda match: self.dictionary[match.group(0)], text)
 
     def contains_japanese(self, text: str) -> bool:
-        if not text:
+        # isascii() is a flag check, and most finished translations are plain ASCII
+        if not text or text.isascii():
             return False
-
-        for char in text:
-            code = ord(char)
-            if (0x3040 <= code <= 0x309F or
-                0x30A0 <= code <= 0x30FF or
-                0x4E00 <= code <= 0x9FFF):
-                return True
-
-        return False
+        return _contains_japanese(text)
 
     def add_to_context(self, jp_name: str, jp_text: str, en_name: str = "", en_text: str = ""):
         if self.context_lines > 0:
@@ -59,87 +165,109 @@ class TranslationPipeline:
                 'enName': en_name,
                 'enText': en_text
             })
-            if len(self.current_context) > self.context_lines:
-                self.current_context.pop(0)
 
     def build_context_string(self) -> str:
         if not self.current_context:
             return ""
 
-        context_parts = []
-        for ctx in self.current_context:
-            if ctx['enText']:
-                context_parts.append(f"{ctx['jpName']}: {ctx['jpText']}\n[Translation]: {ctx['enName']}: {ctx['enText']}")
-            else:
-                context_parts.append(f"{ctx['jpName']}: {ctx['jpText']}")
-
-        return "\n\nPrevious dialogue for context:\n" + "\n".join(context_parts) + "\n\nNow translate:"
+        context_parts = [
+            f"{ctx['jpName']}: {ctx['jpText']}\n[Translation]: {ctx['enName']}: {ctx['enText']}"
+            if ctx['enText'] else f"{ctx['jpName']}: {ctx['jpText']}"
+            for ctx in self.current_context
+        ]
 
-    def call_llm(self, text: str, context: str = "", retry_count: int = 0) -> Optional[str]:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.llm_config['api_key']}"
-        }
+        return CONTEXT_HEADER + "\n".join(context_parts) + CONTEXT_FOOTER
 
+    def call_llm(self, text: str, context: str = "", response_format: Optional[Dict] = None) -> Optional[str]:
         user_message = context + "\n" + text if context else text
+        model = self._llm_setting('model')
 
         payload = {
-            "model": self.llm_config['model'],
+            "model": model,
             "messages": [
-                {
-                    "role": "system",
-                    "content": self.llm_config['system_prompt']
-                },
+                self._system_message,
                 {
                     "role": "user",
                     "content": f"Translate this to English: {user_message}"
                 }
             ],
-            "temperature": self.llm_config['temperature'],
-            "max_tokens": self.llm_config['max_tokens'],
-            "min_p": self.llm_config.get('min_p', 0.05)
+            "temperature": self._llm_setting('temperature'),
+            **self._payload_template
         }
+        if response_format is not None:
+            payload["response_format"] = response_format
+        body = encode_json(payload)
 
-        optional_params = {
-            "top_p": self.llm_config.get('top_p'),
-            "top_k": self.llm_config.get('top_k')
-        }
-        for param, value in optional_params.items():
-            if value is not None:
-                payload[param] = value
+        with self._debug_lock:
+            if ('requested_model', model) not in self._logged:
+                print(f"    [DEBUG] Requesting model: {model}")
+                self._logged.add(('requested_model', model))
+
+        max_retries = self.trans_config['retry_attempts']
 
-        if retry_count == 0 and not hasattr(self, '_debug_shown'):
-            print(f"    [DEBUG] Requesting model: {self.llm_config['model']}")
-            self._debug_shown = True
+        for attempt in range(max_retries + 1):
+            retry_after = None
+
+            try:
+                response = self.session.post(
+                    self.llm_config['api_url'],
+                    data=body,
+                    timeout=60
+                )
+            except RETRYABLE_EXCEPTIONS as e:
+                print(f"Error calling LLM: {e}")
+            except requests.exceptions.RequestException as e:
+                # Bad URL, redirect loop and the like: a config problem retrying won't fix
+                print(f"Error calling LLM: {e}")
+                return None
+            else:
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    print(f"Error calling LLM: HTTP {response.status_code} from {self.llm_config['api_url']}")
+                    retry_after = self._parse_retry_after(response)
+                else:
+                    # Anything else (bad request, unknown model, malformed reply) won't be fixed by retrying
+                    try:
+                        response.raise_for_status()
+
+                        result = response.json()
+
+                        with self._debug_lock:
+                            if ('served_model', model) not in self._logged:
+                                if 'model' in result:
+                                    print(f"    [DEBUG] LM Studio using: {result['model']}")
+                                self._logged.add(('served_model', model))
+
+                        translated = result['choices'][0]['message']['content'].strip()
+                        return translated
+
+                    except Exception as e:
+                        print(f"Error calling LLM: {e}")
+                        return None
+
+            if attempt < max_retries:
+                delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+                print(f"Retrying in {delay:.1f}s... (attempt {attempt + 1}/{max_retries})")
+                time.sleep(delay)
+
+        return None
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter, so concurrent workers don't retry in lockstep
+        base_delay = self.trans_config['retry_delay']
+        return random.uniform(0, min(MAX_RETRY_DELAY, base_delay * (2 ** attempt)))
+
+    def _parse_retry_after(self, response: requests.Response) -> Optional[float]:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is None:
+            return None
 
         try:
-            response = requests.post(
-                self.llm_config['api_url'],
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            response.raise_for_status()
-
-            result = response.json()
-
-            if not hasattr(self, '_actual_model_shown'):
-                if 'model' in result:
-                    print(f"    [DEBUG] LM Studio using: {result['model']}")
-                self._actual_model_shown = True
-
-            translated = result['choices'][0]['message']['content'].strip()
-            return translated
-
-        except Exception as e:
-            print(f"Error calling LLM: {e}")
-            if retry_count < self.trans_config['retry_attempts']:
-                print(f"Retrying... (attempt {retry_count + 1}/{self.trans_config['retry_attempts']})")
-                time.sleep(self.trans_config['retry_delay'])
-                return self.call_llm(text, context, retry_count + 1)
+            return min(MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            # HTTP-date form; let the regular backoff decide
             return None
 
-    def translate_text(self, text: str, is_name: bool = False, use_context: bool = True, retry_count: int = 0) -> str:
+    def translate_text(self, text: str, is_name: bool = False, use_context: bool = True) -> str:
         preprocessed = self.preprocess_text(text)
 
         context = ""
@@ -149,23 +277,34 @@ class TranslationPipeline:
         if is_name and preprocessed != text:
             return preprocessed
 
-        translated = self.call_llm(preprocessed, context)
-        if not translated:
-            return preprocessed
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(preprocessed, context)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
         retry_on_japanese = self.trans_config.get('retry_on_japanese', True)
         max_retries = self.trans_config.get('retry_attempts', 3)
 
-        if retry_on_japanese and retry_count < max_retries:
-            if self.contains_japanese(translated):
-                print(f"      [WARNING] Translation contains Japanese: {translated[:50]}...")
-                print(f"      [RETRY] Retranslating (attempt {retry_count + 1}/{max_retries})...")
-                time.sleep(self.trans_config.get('retry_delay', 2))
-                return self.translate_text(text, is_name, use_context, retry_count + 1)
+        for attempt in range(max_retries + 1):
+            translated = self.call_llm(preprocessed, context)
+            if not translated:
+                return preprocessed
+
+            if not (retry_on_japanese and attempt < max_retries and self.contains_japanese(translated)):
+                break
+
+            print(f"      [WARNING] Translation contains Japanese: {translated[:50]}...")
+            print(f"      [RETRY] Retranslating (attempt {attempt + 1}/{max_retries})...")
+            time.sleep(self.trans_config.get('retry_delay', 2))
+
+        if cache_key is not None and self._is_cacheable(preprocessed, translated):
+            self.cache.put_many([(cache_key, translated)])
 
         return translated
 
-    def translate_batch(self, texts: List[str], use_context: bool = True, retry_count: int = 0) -> List[str]:
+    def translate_batch(self, texts: List[str], use_context: bool = True) -> List[str]:
         if not texts:
             return []
 
@@ -175,6 +314,65 @@ class TranslationPipeline:
         if use_context and self.context_lines > 0:
             context = self.build_context_string() + "\n\n"
 
+        if self.cache is None:
+            return self._request_batch(preprocessed, context)[0]
+
+        # Serve what we can from the cache and only send the rest to the LLM
+        keys = [self._cache_key(text, context) for text in preprocessed]
+        translations = [self.cache.get(key) for key in keys]
+        misses = [idx for idx, translation in enumerate(translations) if translation is None]
+
+        if misses:
+            results, aligned = self._request_batch([preprocessed[idx] for idx in misses], context)
+            for idx, translation in zip(misses, results):
+                translations[idx] = translation
+
+            # A reply whose lines didn't line up with the items may have shifted translations
+            # onto the wrong lines; use it for this run but never persist it
+            if aligned:
+                self.cache.put_many((keys[idx], translations[idx]) for idx in misses
+                                    if self._is_cacheable(preprocessed[idx], translations[idx]))
+
+        return translations
+
+    def _request_batch(self, preprocessed: List[str], context: str) -> Tuple[List[str], bool]:
+        # Returns the translations and whether the reply mapped one-to-one onto the items
+        retry_on_japanese = self.trans_config.get('retry_on_japanese', True)
+        max_retries = self.trans_config.get('retry_attempts', 3)
+
+        for attempt in range(max_retries + 1):
+            if self.trans_config.get('structured_batch_output', False):
+                reply = self._request_batch_structured(preprocessed, context)
+            else:
+                reply = self._request_batch_numbered(preprocessed, context)
+
+            if reply is None:
+                return preprocessed, False
+            translations, aligned = reply
+
+            if not translations:
+                # The reply came back but was unusable (e.g. JSON cut off at max_tokens)
+                if attempt < max_retries:
+                    print(f"      [RETRY] Retranslating batch (attempt {attempt + 1}/{max_retries})...")
+                    time.sleep(self.trans_config.get('retry_delay', 2))
+                    continue
+                return preprocessed, False
+
+            if not (retry_on_japanese and attempt < max_retries):
+                break
+
+            failed_idx = next((idx for idx, translation in enumerate(translations)
+                               if self.contains_japanese(translation)), None)
+            if failed_idx is None:
+                break
+
+            print(f"      [WARNING] Translation {failed_idx + 1} contains Japanese: {translations[failed_idx][:50]}...")
+            print(f"      [RETRY] Retranslating batch (attempt {attempt + 1}/{max_retries})...")
+            time.sleep(self.trans_config.get('retry_delay', 2))
+
+        return translations, aligned
+
+    def _request_batch_numbered(self, preprocessed: List[str], context: str) -> Optional[Tuple[List[str], bool]]:
         batch_text = context + "Translate each line below:\n\n"
         for idx, text in enumerate(preprocessed, 1):
             batch_text += f"{idx}. {text}\n"
@@ -183,7 +381,7 @@ class TranslationPipeline:
 
         result = self.call_llm(batch_text, "")
         if not result:
-            return preprocessed
+            return None
 
         translations = []
         lines = result.strip().split('\n')
@@ -193,45 +391,58 @@ class TranslationPipeline:
             if not line:
                 continue
 
-            import re
-            match = re.match(r'^\d+[\.\)\:]\s*(.+)$', line)
+            match = BATCH_LINE_RE.match(line)
             if match:
                 translations.append(match.group(1))
             else:
                 translations.append(line)
 
-        while len(translations) < len(texts):
-            translations.append(preprocessed[len(translations)])
-
-        translations = translations[:len(texts)]
+        # Missing lines fall back to the untranslated text; extra lines are dropped. Either
+        # means the reply split or merged lines, so the positions can't be trusted
+        aligned = len(translations) == len(preprocessed)
+        return translations[:len(preprocessed)] + preprocessed[len(translations):], aligned
+
+    def _request_batch_structured(self, preprocessed: List[str], context: str) -> Optional[Tuple[List[str], bool]]:
+        # Items travel as JSON and come back matched by id, so multi-line texts and
+        # skipped or merged lines can't shift translations onto the wrong item
+        items = [{"id": idx, "text": text} for idx, text in enumerate(preprocessed, 1)]
+        batch_text = (context + 'Translate the "text" of each item in this JSON array:\n\n' +
+                      encode_json(items).decode('utf-8') +
+                      '\n\nReply with a JSON object {"translations": [{"id": <id>, "en": "<English translation>"}, ...]} '
+                      'with one entry for every id.')
+
+        result = self.call_llm(batch_text, "", response_format=BATCH_RESPONSE_FORMAT)
+        if not result:
+            return None
 
-        retry_on_japanese = self.trans_config.get('retry_on_japanese', True)
-        max_retries = self.trans_config.get('retry_attempts', 3)
+        try:
+            by_id = {entry['id']: entry['en'] for entry in parse_json(result)['translations']
+                     if isinstance(entry.get('en'), str)}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"      [WARNING] Could not parse structured batch reply: {e}")
+            # An empty result tells _request_batch to retry rather than give up
+            return [], False
 
-        if retry_on_japanese and retry_count < max_retries:
-            has_japanese = False
-            for idx, translation in enumerate(translations):
-                if self.contains_japanese(translation):
-                    has_japanese = True
-                    print(f"      [WARNING] Translation {idx+1} contains Japanese: {translation[:50]}...")
-                    break
+        # Matched by id, so every returned translation belongs to its item
+        return [by_id.get(idx) or text for idx, text in enumerate(preprocessed, 1)], True
 
-            if has_japanese:
-                print(f"      [RETRY] Retranslating batch (attempt {retry_count + 1}/{max_retries})...")
-                time.sleep(self.trans_config.get('retry_delay', 2))
-                return self.translate_batch(texts, use_context, retry_count + 1)
+    def _cache_key(self, preprocessed: str, context: str) -> str:
+        # The model and prompt are part of the key so changing either never serves stale output
+        return TranslationCache.make_key(self._llm_setting('model'), self.llm_config['system_prompt'],
+                                         context, preprocessed)
 
-        return translations
+    def _is_cacheable(self, preprocessed: str, translated: str) -> bool:
+        # Failed calls fall back to the untranslated text; never persist those or Japanese leftovers
+        return bool(translated) and translated != preprocessed and not self.contains_japanese(translated)
 
     def reset_context(self):
-        self.current_context = []
+        self.current_context.clear()
 
     def translate_json_file(self, input_path: str, output_path: str):
         print(f"\nProcessing: {input_path}")
         file_start_time = time.time()
 
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json(input_path)
 
         self.reset_context()
 
@@ -250,8 +461,7 @@ class TranslationPipeline:
         self._clean_monologue_names(data)
 
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        dump_json(data, output_path, pretty=self.trans_config.get('pretty_output', True))
 
         file_elapsed = time.time() - file_start_time
         print(f"  Translated {translated_count} items")
@@ -260,6 +470,8 @@ class TranslationPipeline:
 
     def _translate_json_sequential(self, data: Dict, total_blocks: int) -> int:
         translated_count = 0
+        # Pause between requests; only useful against rate-limited remote APIs
+        per_item_delay = self.trans_config.get('per_item_delay', 0)
 
         for idx, block in enumerate(data.get('text', []), 1):
             print(f"  Block {idx}/{total_blocks} (blockIdx: {block.get('blockIdx', '?')})")
@@ -275,7 +487,8 @@ class TranslationPipeline:
                 block['enName'] = en_name
                 print(f"    -> {en_name}")
                 translated_count += 1
-                time.sleep(0.5)
+                if per_item_delay > 0:
+                    time.sleep(per_item_delay)
 
             if en_text == '' and jp_text:
                 print(f"    Translating text: {jp_text[:50]}...")
@@ -283,7 +496,8 @@ class TranslationPipeline:
                 block['enText'] = en_text
                 print(f"    -> {en_text[:50]}...")
                 translated_count += 1
-                time.sleep(0.5)
+                if per_item_delay > 0:
+                    time.sleep(per_item_delay)
 
             self.add_to_context(jp_name, jp_text, en_name, en_text)
 
@@ -296,7 +510,8 @@ class TranslationPipeline:
                         choice['enText'] = en_choice
                         print(f"    -> {en_choice}")
                         translated_count += 1
-                        time.sleep(0.5)
+                        if per_item_delay > 0:
+                            time.sleep(per_item_delay)
 
         return translated_count
 
@@ -331,42 +546,60 @@ class TranslationPipeline:
         if not all_items:
             return 0
 
-        print(f"  Collected {len(all_items)} items to translate")
+        # Identical strings (names especially) repeat throughout a file; send each one once
+        # and fan the translation out to every item that uses it
+        items_by_text: Dict[str, List] = {}
+        for item in all_items:
+            items_by_text.setdefault(item[2], []).append(item)
+        unique_texts = list(items_by_text)
 
-        num_batches = (len(all_items) + batch_size - 1) // batch_size
+        print(f"  Collected {len(all_items)} items to translate ({len(unique_texts)} unique)")
+
+        num_batches = (len(unique_texts) + batch_size - 1) // batch_size
+        # Spread texts evenly (e.g. 31+31 rather than 50+12): batches run concurrently, so
+        # the largest one sets the wall time. Never exceeds the configured batch_size.
+        batch_size = (len(unique_texts) + num_batches - 1) // num_batches
         batch_delay = self.trans_config.get('batch_delay', 0)
+        inflight_batches = max(1, self.trans_config.get('inflight_batches', 4))
         failed_items = []
 
-        for batch_num in range(num_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, len(all_items))
-            batch_items = all_items[start_idx:end_idx]
+        # Batches are independent (no context), so keep several in flight and let the
+        # server schedule them together; results are applied in order once all finish
+        batches = []
+        with ThreadPoolExecutor(max_workers=inflight_batches) as executor:
+            for batch_num in range(num_batches):
+                start_idx = batch_num * batch_size
+                end_idx = min(start_idx + batch_size, len(unique_texts))
+                batch_texts = unique_texts[start_idx:end_idx]
 
-            print(f"  Batch {batch_num + 1}/{num_batches}: Translating items {start_idx + 1}-{end_idx}")
+                print(f"  Batch {batch_num + 1}/{num_batches}: Translating items {start_idx + 1}-{end_idx}")
 
-            batch_texts = [item[2] for item in batch_items]
+                future = executor.submit(self.translate_batch, batch_texts, use_context=False)
+                batches.append((batch_texts, future))
 
-            translations = self.translate_batch(batch_texts, use_context=False)
+                if batch_delay > 0 and batch_num < num_batches - 1:
+                    time.sleep(batch_delay)
 
-            for item, translation in zip(batch_items, translations):
-                item_type, obj, original_text, block_idx = item
+        for batch_texts, future in batches:
+            translations = future.result()
 
-                if item_type == 'name':
-                    obj['enName'] = translation
-                    print(f"    [{block_idx}] Name: {translation[:40]}")
-                elif item_type == 'text':
-                    obj['enText'] = translation
-                    print(f"    [{block_idx}] Text: {translation[:60]}...")
-                elif item_type == 'choice':
-                    obj['enText'] = translation
+            for text, translation in zip(batch_texts, translations):
+                for item in items_by_text[text]:
+                    item_type, obj, original_text, block_idx = item
 
-                if self.contains_japanese(translation):
-                    failed_items.append((item, translation))
+                    if item_type == 'name':
+                        obj['enName'] = translation
+                        print(f"    [{block_idx}] Name: {translation[:40]}")
+                    elif item_type == 'text':
+                        obj['enText'] = translation
+                        print(f"    [{block_idx}] Text: {translation[:60]}...")
+                    elif item_type == 'choice':
+                        obj['enText'] = translation
 
-                translated_count += 1
+                    if self.contains_japanese(translation):
+                        failed_items.append((item, translation))
 
-            if batch_delay > 0 and batch_num < num_batches - 1:
-                time.sleep(batch_delay)
+                    translated_count += 1
 
         if failed_items and self.trans_config.get('enable_two_pass', False):
             translated_count += self._second_pass_translation(failed_items)
@@ -382,11 +615,13 @@ class TranslationPipeline:
             jp_text = block.get('jpText', '')
             en_text = block.get('enText', '')
 
-            if en_name.lower() == 'monologue':
+            # Length check first so the lower() copy is only made for likely matches
+            if len(en_name) == len(MONOLOGUE) and en_name.lower() == MONOLOGUE:
                 block['enName'] = ''
                 cleaned_names += 1
 
-            if (not jp_text or not jp_text.strip()) and en_text.lower() == 'monologue':
+            if ((not jp_text or not jp_text.strip()) and
+                    len(en_text) == len(MONOLOGUE) and en_text.lower() == MONOLOGUE):
                 block['enText'] = ''
                 cleaned_texts += 1
 
@@ -403,7 +638,6 @@ class TranslationPipeline:
         print(f"  Found {len(failed_items)} items with Japanese - retranslating with second model")
 
         original_model = self.llm_config['model']
-        original_temp = self.llm_config['temperature']
 
         second_model = self.trans_config.get('second_pass_model', original_model)
         second_temp = self.trans_config.get('second_pass_temperature', 0.3)
@@ -414,25 +648,32 @@ class TranslationPipeline:
             print(f"  Skipping second pass (would produce same results)\n")
             return 0
 
-        self.llm_config['model'] = second_model
-        self.llm_config['temperature'] = second_temp
         print(f"  Using model: {second_model} (temp={second_temp})")
         print(f"  NOTE: Make sure this model is loaded in LM Studio!")
 
-        if hasattr(self, '_debug_shown'):
-            delattr(self, '_debug_shown')
-        if hasattr(self, '_actual_model_shown'):
-            delattr(self, '_actual_model_shown')
+        # Only this thread's requests switch models; files translating concurrently keep
+        # using the primary model
+        self._local.llm_overrides = {'model': second_model, 'temperature': second_temp}
+        try:
+            return self._run_second_pass(failed_items, second_model)
+        finally:
+            self._local.llm_overrides = None
 
+    def _run_second_pass(self, failed_items: List, second_model: str) -> int:
         retranslated_count = 0
         batch_size = self.trans_config.get('batch_size', 25)
         model_not_loaded = False
 
-        for i in range(0, len(failed_items), batch_size):
-            batch = failed_items[i:i + batch_size]
-            print(f"  Second pass batch: {i + 1}-{min(i + batch_size, len(failed_items))}")
+        # A repeated string that failed once failed everywhere; retry each text once and
+        # apply the result to every item that uses it, as the first pass does
+        items_by_text: Dict[str, List] = {}
+        for item, _ in failed_items:
+            items_by_text.setdefault(item[2], []).append(item)
+        unique_texts = list(items_by_text)
 
-            batch_texts = [item[0][2] for item in batch]
+        for i in range(0, len(unique_texts), batch_size):
+            batch_texts = unique_texts[i:i + batch_size]
+            print(f"  Second pass batch: {i + 1}-{min(i + batch_size, len(unique_texts))}")
 
             try:
                 translations = self.translate_batch(batch_texts, use_context=False)
@@ -448,28 +689,24 @@ class TranslationPipeline:
                 model_not_loaded = True
                 break
 
-            for (item, old_translation), new_translation in zip(batch, translations):
-                item_type, obj, _, block_idx = item
-
-                if not new_translation:
-                    print(f"    ✗ [{block_idx}] Translation failed, keeping original")
-                    continue
-
-                if not self.contains_japanese(new_translation):
-                    if item_type == 'name':
-                        obj['enName'] = new_translation
-                        print(f"    ✓ [{block_idx}] Name fixed: {new_translation[:40]}")
-                    elif item_type == 'text':
-                        obj['enText'] = new_translation
-                        print(f"    ✓ [{block_idx}] Text fixed: {new_translation[:60]}...")
-                    elif item_type == 'choice':
-                        obj['enText'] = new_translation
-                    retranslated_count += 1
-                else:
-                    print(f"    ✗ [{block_idx}] Still contains Japanese, keeping best attempt")
-
-        self.llm_config['model'] = original_model
-        self.llm_config['temperature'] = original_temp
+            for text, new_translation in zip(batch_texts, translations):
+                for item_type, obj, _, block_idx in items_by_text[text]:
+                    if not new_translation:
+                        print(f"    ✗ [{block_idx}] Translation failed, keeping original")
+                        continue
+
+                    if not self.contains_japanese(new_translation):
+                        if item_type == 'name':
+                            obj['enName'] = new_translation
+                            print(f"    ✓ [{block_idx}] Name fixed: {new_translation[:40]}")
+                        elif item_type == 'text':
+                            obj['enText'] = new_translation
+                            print(f"    ✓ [{block_idx}] Text fixed: {new_translation[:60]}...")
+                        elif item_type == 'choice':
+                            obj['enText'] = new_translation
+                        retranslated_count += 1
+                    else:
+                        print(f"    ✗ [{block_idx}] Still contains Japanese, keeping best attempt")
 
         if model_not_loaded:
             print(f"\n  ⚠ Second pass incomplete: Model not available")
@@ -492,7 +729,7 @@ class TranslationPipeline:
             print(f"Error: Input folder '{input_folder}' does not exist")
             return
 
-        json_files = list(input_folder.rglob('*.json'))
+        json_files = [Path(json_file) for json_file in find_json_files(input_folder)]
 
         if not json_files:
             print(f"No JSON files found in '{input_folder}'")
@@ -532,8 +769,7 @@ class TranslationPipeline:
             output_path = output_folder / relative_path
 
             try:
-                pipeline = TranslationPipeline(self.trans_config.get('config_path', 'config.toml'))
-                pipeline.translate_json_file(str(json_file), str(output_path))
+                self.translate_json_file(str(json_file), str(output_path))
                 return (json_file, True, None)
             except Exception as e:
                 return (json_file, False, str(e))
@@ -0,0 +1,66 @@
+"""
+Persistent cache of LLM translations, stored as an append-only JSON Lines file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+_caches: Dict[str, "TranslationCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def get_translation_cache(path: str) -> "TranslationCache":
+    """Return the process-wide cache for path, so concurrent pipelines share hits."""
+    key = os.path.abspath(path)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = TranslationCache(key)
+        return _caches[key]
+
+
+class TranslationCache:
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._entries[entry['key']] = entry['text']
+                    except (ValueError, KeyError, TypeError):
+                        # A run killed mid-write can leave a truncated last line
+                        continue
+            print(f"Loaded {len(self._entries)} cached translations")
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._entries.get(key)
+
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Store (key, text) pairs and append the new ones to the cache file."""
+        with self._lock:
+            lines = []
+            for key, text in items:
+                if self._entries.get(key) != text:
+                    self._entries[key] = text
+                    lines.append(json.dumps({'key': key, 'text': text}, ensure_ascii=False) + '\n')
+
+            if lines:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.writelines(lines)
+
+    def __len__(self) -> int:
+        return len(self._entries)